@@ -3,7 +3,11 @@ import sys
 import time
 import json
 import yaml
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from typing import Dict, List, Optional
 from urllib.parse import urlparse
@@ -12,6 +16,10 @@ import vk_api
 import requests
 from dotenv import load_dotenv
 
+from http_session import TimeoutSession, get_proxies
+from vk_markup import vk_to_discord, DISCORD_TEXT_LIMIT
+from profiling import CycleTracer, ProfilingControl, SamplingProfiler, traced
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +31,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class DeadlineExceeded(Exception):
+    """Операция не уложилась в отведенное время
+
+    clipped=True - дедлайн был урезан бюджетом цикла, а не собственным
+    таймаутом операции: группа не медленная, ей просто не хватило времени.
+    """
+
+    def __init__(self, message: str, clipped: bool = False):
+        super().__init__(message)
+        self.clipped = clipped
+
+
 class VK2DiscordBot:
     def __init__(self, use_proxy: bool = True):
         """Инициализация бота"""
@@ -50,25 +70,56 @@ class VK2DiscordBot:
         self.use_proxy = use_proxy
         self.proxies = self.get_proxies() if use_proxy else {}
 
-        # Инициализация VK API
-        self.vk_session = vk_api.VkApi(token=self.vk_token)
-        self.vk = self.vk_session.get_api()
+        # Бюджеты времени цикла
+        bot_config = self.config.get('bot', {}) or {}
+        self.interval = bot_config.get('interval', 60)
+        self.cycle_budget = bot_config.get('cycle_budget', self.interval)
+        self.fetch_timeout = bot_config.get('fetch_timeout', 15)
+        self.send_timeout = bot_config.get('send_timeout', 30)
+        self.lagging_backoff = bot_config.get('lagging_backoff', 60)
+        self.lagging_backoff_max = bot_config.get('lagging_backoff_max', 900)
+        self.group_pause = bot_config.get('group_pause', 2)
+
+        # Таймаут requests на соединение и на каждое чтение (не на весь запрос).
+        # Общее время получения ограничивает fetch_timeout через call_with_deadline,
+        # а брошенный по дедлайну запрос занимает только VkApi своей группы
+        self.http_timeout = bot_config.get('http_timeout', self.fetch_timeout / 3)
+
+        # Инициализация VK API: отдельный VkApi на группу. VkApi.method держит
+        # self.lock на все время HTTP-запроса, поэтому общий VkApi позволил бы
+        # зависшей группе блокировать запросы остальных
+        self.vk_apis = {}
+        self.vk_apis_lock = threading.Lock()
+
+        # Пул для запросов к VK с дедлайном: зависший запрос не блокирует цикл
+        self.executor = ThreadPoolExecutor(max_workers=max(4, len(self.config.get('groups', []) or [])))
 
         # Состояние бота
         self.last_posts = {}
+        self.lagging_groups = {}  # group_id -> {'failures': int, 'retry_at': float, 'reason': str}
+        self.skipped_groups = []  # Группы, которым не хватило бюджета: в следующем цикле идут первыми
+        self.last_cycle_report = {}
+        self.text_cache = OrderedDict()  # (owner_id, post_id, хэш правки) -> текст Discord
+        self.text_cache_size = 256
+
+        # Профилирование и трассировка циклов
+        profiling_config = self.config.get('profiling', {}) or {}
+        self.tracer = CycleTracer(max_cycles=profiling_config.get('trace_cycles', 20))
+        self.profiler = SamplingProfiler(
+            interval=profiling_config.get('sample_interval', 0.01),
+            mode=profiling_config.get('sample_mode', 'wall'),
+            idle_frames={('bot.py', 'wait_next_cycle')}
+        )
+        self.profiling_control = ProfilingControl(
+            self.profiler,
+            self.tracer,
+            dump_dir=profiling_config.get('dump_dir', 'data/profiles'),
+            socket_path=profiling_config.get('control_socket') or None
+        )
 
     def get_proxies(self) -> Dict:
         """Получение списка прокси для обхода блокировок"""
-        free_proxies = [
-            'http://45.61.187.67:4001',
-            'http://45.61.188.24:4002',
-            'http://45.61.188.15:4003',
-        ]
-
-        return {
-            'http': free_proxies[0],
-            'https': free_proxies[0]
-        }
+        return get_proxies()
 
     def test_discord_connection(self) -> bool:
         """Тестирование подключения к Discord для обоих вебхуков"""
@@ -128,32 +179,52 @@ class VK2DiscordBot:
 
         return success
 
-    def get_group_info(self, group_id: str) -> Dict:
-        """Получение информации о группе"""
+    def get_vk(self, group_id: str):
+        """VK API для группы (свой VkApi и HTTP-сессия на каждую группу)"""
+        with self.vk_apis_lock:
+            if group_id not in self.vk_apis:
+                vk_session = vk_api.VkApi(token=self.vk_token, session=TimeoutSession(self.http_timeout))
+                self.vk_apis[group_id] = vk_session.get_api()
+            return self.vk_apis[group_id]
+
+    @traced(group=0)
+    def get_group_info(self, group_id: str, raise_errors: bool = False) -> Dict:
+        """Получение информации о группе
+
+        raise_errors=True пробрасывает ошибки VK вместо пустого результата.
+        """
+        vk = self.get_vk(group_id)
         try:
             if isinstance(group_id, str) and not group_id.isdigit():
-                group_info = self.vk.groups.getById(group_id=group_id)
+                group_info = vk.groups.getById(group_id=group_id)
             else:
-                group_info = self.vk.groups.getById(group_id=int(group_id))
+                group_info = vk.groups.getById(group_id=int(group_id))
 
             return group_info[0] if group_info else {}
         except Exception as e:
             logger.error(f"Ошибка получения информации о группе {group_id}: {e}")
+            if raise_errors:
+                raise
             return {}
 
-    def get_last_posts(self, group_id: str, count: int = 10) -> List[Dict]:
-        """Получение последних постов из группы с отладкой"""
+    @traced(group=0)
+    def get_last_posts(self, group_id: str, count: int = 10, raise_errors: bool = False) -> List[Dict]:
+        """Получение последних постов из группы с отладкой
+
+        raise_errors=True пробрасывает ошибки VK, чтобы отличить
+        "постов нет" от "получить посты не удалось".
+        """
         try:
             logger.info(f"🔄 Получение постов для группы {group_id}")
 
-            group_info = self.get_group_info(group_id)
+            group_info = self.get_group_info(group_id, raise_errors=raise_errors)
             vk_group_id = f"-{group_info['id']}" if group_info else f"-{group_id}"
 
             logger.info(f"📊 VK ID группы: {vk_group_id}")
             logger.info(f"🎯 Используем filter='all' (все посты)")
 
             # Получаем посты
-            posts = self.vk.wall.get(
+            posts = self.get_vk(group_id).wall.get(
                 owner_id=vk_group_id,
                 count=count,
                 filter='all',  # ВСЕ посты
@@ -174,6 +245,8 @@ class VK2DiscordBot:
 
         except Exception as e:
             logger.error(f"❌ Ошибка получения постов из {group_id}: {e}")
+            if raise_errors:
+                raise
             return []
 
     def contains_video_emoji(self, post: Dict) -> bool:
@@ -196,12 +269,26 @@ class VK2DiscordBot:
                 return True
         return False
 
-    def format_post_multiple_embeds(self, post: Dict, group_info: Dict, is_calendar_post: bool = False) -> Dict:
-        """Форматирование с несколькими embeds"""
+    def render_post_text(self, post: Dict) -> str:
+        """Текст поста в Markdown Discord с кэшем по ID поста и хэшу правки"""
         text = post.get('text', '')
+        edit_hash = hashlib.sha1(f"{post.get('edited', 0)}:{text}".encode('utf-8')).hexdigest()
+        key = (post.get('owner_id'), post.get('id'), edit_hash)
+
+        if key in self.text_cache:
+            self.text_cache.move_to_end(key)
+            return self.text_cache[key]
 
-        if len(text) > 2000:
-            text = text[:1997] + "..."
+        rendered = vk_to_discord(text, DISCORD_TEXT_LIMIT)
+        self.text_cache[key] = rendered
+        if len(self.text_cache) > self.text_cache_size:
+            self.text_cache.popitem(last=False)
+        return rendered
+
+    @traced()
+    def format_post_multiple_embeds(self, post: Dict, group_info: Dict, is_calendar_post: bool = False) -> Dict:
+        """Форматирование с несколькими embeds"""
+        text = self.render_post_text(post)
 
         # Получаем фото
         photo_urls = []
@@ -251,8 +338,13 @@ class VK2DiscordBot:
 
         return message
 
-    def send_to_discord_with_retry(self, message: Dict, is_calendar_post: bool = False, max_retries: int = 3) -> bool:
-        """Отправка сообщения в Discord с повторными попытками"""
+    @traced()
+    def send_to_discord_with_retry(self, message: Dict, is_calendar_post: bool = False, max_retries: int = 3,
+                                   deadline: Optional[float] = None) -> bool:
+        """Отправка сообщения в Discord с повторными попытками
+
+        deadline - момент time.monotonic(), после которого попытки прекращаются.
+        """
         # Выбираем правильный вебхук в зависимости от типа поста
         if is_calendar_post:
             webhook_url = self.discord_calendar_webhook
@@ -264,6 +356,14 @@ class VK2DiscordBot:
         logger.info(f"Отправляем {post_type} пост. Вебхук: {webhook_url[:80]}...")
 
         for attempt in range(max_retries):
+            timeout = 30
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 1:
+                    logger.warning(f"⏱️ Дедлайн отправки {post_type} поста истек после {attempt} попыток")
+                    return False
+                timeout = min(timeout, remaining)
+
             try:
                 logger.info(f"Попытка {attempt + 1} отправки {post_type} поста в Discord...")
                 logger.info(f"Отправляем сообщение: {message.get('username', 'No username')}")
@@ -272,7 +372,7 @@ class VK2DiscordBot:
                     webhook_url,
                     json=message,
                     headers={'Content-Type': 'application/json'},
-                    timeout=30,
+                    timeout=timeout,
                     proxies=self.proxies if self.use_proxy else None
                 )
 
@@ -283,18 +383,220 @@ class VK2DiscordBot:
                     return True
                 else:
                     logger.error(f"❌ Discord вернул ошибку {response.status_code}: {response.text}")
-                    time.sleep(5)
 
             except requests.exceptions.Timeout:
                 logger.error(f"⚠️ Таймаут при попытке {attempt + 1} отправки {post_type} поста")
-                time.sleep(5)
             except Exception as e:
                 logger.error(f"⚠️ Ошибка при попытке {attempt + 1} отправки {post_type} поста: {str(e)}")
-                time.sleep(5)
+
+            if attempt < max_retries - 1:
+                self.sleep_until(deadline, 5)
 
         logger.error(f"❌ Не удалось отправить {post_type} пост после {max_retries} попыток")
         return False
 
+    @staticmethod
+    def sleep_until(deadline: Optional[float], seconds: float):
+        """Пауза, не выходящая за дедлайн"""
+        if deadline is not None:
+            seconds = min(seconds, deadline - time.monotonic())
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def call_with_deadline(self, deadline: float, func, *args, **kwargs):
+        """Вызов блокирующей функции с дедлайном
+
+        Функция выполняется в пуле потоков; если она не успевает до дедлайна,
+        поднимается DeadlineExceeded, а зависший запрос дорабатывает в фоне.
+        clipped передается в исключение (дедлайн урезан бюджетом цикла).
+        """
+        clipped = kwargs.pop('clipped', False)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{func.__name__}: нет времени на вызов", clipped)
+
+        future = self.executor.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            raise DeadlineExceeded(f"{func.__name__}: превышен дедлайн {remaining:.1f} сек", clipped)
+
+    def mark_lagging(self, group_id: str, reason: str):
+        """Перевод группы в отстающую очередь с экспоненциальной задержкой"""
+        state = self.lagging_groups.setdefault(group_id, {'failures': 0})
+        state['failures'] += 1
+        backoff = min(self.lagging_backoff * 2 ** (state['failures'] - 1), self.lagging_backoff_max)
+        state['retry_at'] = time.monotonic() + backoff
+        state['reason'] = reason
+        logger.warning(f"🐢 Группа {group_id} отстает ({reason}), повтор через {backoff:.0f} сек")
+
+    def process_group(self, group_config: Dict, cycle_deadline: float):
+        """Проверка одной группы и отправка нового поста
+
+        Поднимает DeadlineExceeded, если получение или отправка не уложились
+        в дедлайн; clipped=True, если дедлайн урезал бюджет цикла.
+        """
+        group_id = group_config['id']
+        group_name = group_config.get('name', group_id)
+
+        logger.info(f"Проверяем группу: {group_name}")
+
+        own_fetch_deadline = time.monotonic() + self.fetch_timeout
+        fetch_deadline = min(own_fetch_deadline, cycle_deadline)
+        fetch_clipped = cycle_deadline < own_fetch_deadline
+        posts = self.call_with_deadline(fetch_deadline, self.get_last_posts, group_id, count=2,
+                                        raise_errors=True, clipped=fetch_clipped)
+        if not posts:
+            return
+
+        # Проверяем, является ли первый пост закрепленным
+        # (закрепленные посты в VK всегда идут первыми)
+        if len(posts) > 0 and posts[0].get('is_pinned') == 1:
+            # Если первый пост закреплен, берем второй (если есть)
+            if len(posts) > 1:
+                latest_post = posts[1]
+                logger.info(f"⏭️ Пропускаем закрепленный пост (ID: {posts[0]['id']})")
+                logger.info(f"📝 Берем следующий пост (ID: {latest_post['id']})")
+            else:
+                logger.info(f"⏭️ Только закрепленный пост, пропускаем проверку")
+                return
+        else:
+            latest_post = posts[0]
+
+        post_key = f"{group_id}_{latest_post['id']}"
+
+        if post_key in self.last_posts:
+            return
+
+        logger.info(f"Найден новый пост: {latest_post['id']}")
+
+        # Проверяем, содержит ли пост эмодзи 🎥
+        if self.contains_video_emoji(latest_post):
+            logger.info(f"⏭️ Пропускаем видео-пост с эмодзи 🎥 (ID: {latest_post['id']})")
+            self.last_posts[post_key] = datetime.now()
+            return
+
+        # Проверяем, содержит ли пост эмодзи 🗓
+        is_calendar_post = self.contains_calendar_emoji(latest_post)
+
+        if is_calendar_post:
+            logger.info(f"📅 Обнаружен календарный пост с эмодзи 🗓 (ID: {latest_post['id']})")
+            logger.info(f"📤 Отправляем в календарный канал")
+        else:
+            logger.info(f"📝 Обнаружен обычный пост (ID: {latest_post['id']})")
+            logger.info(f"📤 Отправляем в обычный канал")
+
+        # Получаем информацию о группе
+        group_info = self.call_with_deadline(fetch_deadline, self.get_group_info, group_id, clipped=fetch_clipped)
+
+        # Форматируем пост
+        discord_message = self.format_post_multiple_embeds(latest_post, group_info, is_calendar_post)
+
+        # Отправляем в Discord
+        own_send_deadline = time.monotonic() + self.send_timeout
+        send_deadline = min(own_send_deadline, cycle_deadline)
+        post_type = "календарный" if is_calendar_post else "обычный"
+        if self.send_to_discord_with_retry(discord_message, is_calendar_post, deadline=send_deadline):
+            self.last_posts[post_key] = datetime.now()
+            logger.info(f"✅ {post_type.capitalize()} пост {latest_post['id']} успешно опубликован в Discord")
+        else:
+            logger.warning(f"⚠️ {post_type.capitalize()} пост {latest_post['id']} не был отправлен в Discord")
+            if time.monotonic() >= send_deadline - 1:
+                raise DeadlineExceeded("send_to_discord_with_retry: превышен дедлайн отправки",
+                                       clipped=cycle_deadline < own_send_deadline)
+
+    def run_cycle(self, groups: List[Dict]) -> Dict:
+        """Один цикл проверки групп в пределах бюджета времени
+
+        Сначала обрабатываются здоровые группы, затем отстающие, у которых
+        подошло время повтора; внутри каждой очереди первыми идут группы,
+        пропущенные в прошлом цикле из-за бюджета. Пауза между группами
+        в бюджет не входит. Возвращает отчет о цикле.
+        """
+        started = time.monotonic()
+        cycle_deadline = started + self.cycle_budget
+        self.tracer.begin_cycle()
+        report = {'slow': [], 'deferred': [], 'recovered': [], 'skipped': [], 'failed': []}
+
+        # Пропущенные в прошлом цикле - первыми, чтобы хвост списка не голодал
+        skipped_before = {group_id: i for i, group_id in enumerate(self.skipped_groups)}
+        ordered = sorted(groups, key=lambda g: skipped_before.get(g['id'], len(skipped_before)))
+        healthy = [g for g in ordered if g['id'] not in self.lagging_groups]
+        lagging = [g for g in ordered if g['id'] in self.lagging_groups]
+
+        processed = 0
+        for group_config in healthy + lagging:
+            group_id = group_config['id']
+            is_lagging = group_id in self.lagging_groups
+
+            if is_lagging and time.monotonic() < self.lagging_groups[group_id]['retry_at']:
+                report['deferred'].append(group_id)
+                continue
+            if time.monotonic() >= cycle_deadline:
+                report['skipped'].append(group_id)
+                continue
+
+            if processed and self.group_pause:
+                # Пауза между запросами к VK не отнимает время у групп
+                pause_started = time.monotonic()
+                time.sleep(self.group_pause)
+                cycle_deadline += time.monotonic() - pause_started
+            processed += 1
+
+            group_started = time.monotonic()
+            try:
+                self.process_group(group_config, cycle_deadline)
+            except (DeadlineExceeded, requests.exceptions.Timeout) as e:
+                if getattr(e, 'clipped', False):
+                    # Группа не медленная - закончился бюджет цикла
+                    report['skipped'].append(group_id)
+                    continue
+                self.mark_lagging(group_id, str(e))
+                report['slow'].append({'group': group_id, 'seconds': round(time.monotonic() - group_started, 2),
+                                       'reason': str(e)})
+                continue
+            except Exception as e:
+                logger.error(f"Ошибка при проверке группы {group_id}: {e}")
+                report['failed'].append(group_id)
+                if is_lagging:
+                    # Повтор не удался - группа остается в отстающей очереди
+                    self.mark_lagging(group_id, str(e))
+                continue
+
+            # Сюда доходим только после успешного получения постов
+            if is_lagging:
+                del self.lagging_groups[group_id]
+                report['recovered'].append(group_id)
+                logger.info(f"🐇 Группа {group_id} вернулась в основную очередь")
+
+        self.skipped_groups = report['skipped']
+        report['duration'] = round(time.monotonic() - started, 2)
+        report['budget'] = self.cycle_budget
+        self.last_cycle_report = report
+        self.tracer.end_cycle(slow=len(report['slow']), deferred=len(report['deferred']),
+                              skipped=len(report['skipped']), failed=len(report['failed']))
+        self.log_cycle_report(report)
+        return report
+
+    def log_cycle_report(self, report: Dict):
+        """Вывод отчета о цикле"""
+        logger.info(f"📋 Цикл: {report['duration']} сек из {report['budget']} сек бюджета")
+        for slow in report['slow']:
+            logger.warning(f"   🐢 Медленная группа {slow['group']}: {slow['seconds']} сек ({slow['reason']})")
+        if report['deferred']:
+            logger.info(f"   ⏸️ Отложены (отстающие): {', '.join(map(str, report['deferred']))}")
+        if report['skipped']:
+            logger.warning(f"   ⏭️ Не хватило бюджета: {', '.join(map(str, report['skipped']))}")
+        if report['failed']:
+            logger.warning(f"   ❌ С ошибкой: {', '.join(map(str, report['failed']))}")
+        if report['recovered']:
+            logger.info(f"   🐇 Восстановлены: {', '.join(map(str, report['recovered']))}")
+
+    @staticmethod
+    def wait_next_cycle(seconds: float):
+        """Пауза между циклами (профайлер считает этот кадр простоем)"""
+        time.sleep(seconds)
+
     def run(self):
         """Запуск основного цикла бота"""
         logger.info("=" * 50)
@@ -303,96 +605,53 @@ class VK2DiscordBot:
         logger.info(f"Обычные посты: {self.discord_normal_webhook[:50]}...")
         logger.info(f"Календарные посты: {self.discord_calendar_webhook[:50]}...")
 
+        try:
+            self.profiling_control.install()
+        except Exception as e:
+            logger.error(f"Не удалось включить управление профилированием: {e}")
+
+        try:
+            self.run_loop()
+        finally:
+            self.profiling_control.shutdown()
+
+    def run_loop(self):
+        """Инициализация групп и основной цикл проверки"""
         # Инициализация групп
         groups = self.config.get('groups', [])
         for group_config in groups:
             group_id = group_config['id']
-            posts = self.get_last_posts(group_id, count=1)
+            try:
+                posts = self.call_with_deadline(time.monotonic() + self.fetch_timeout,
+                                                self.get_last_posts, group_id, count=1)
+            except DeadlineExceeded as e:
+                self.mark_lagging(group_id, str(e))
+                continue
             if posts:
                 post_key = f"{group_id}_{posts[0]['id']}"
                 self.last_posts[post_key] = datetime.now()
                 logger.info(f"Инициализирована группа: {group_config.get('name', group_id)}")
 
-        interval = self.config.get('bot', {}).get('interval', 60)
-        logger.info(f"Начинаем проверку с интервалом {interval} секунд")
+        interval = self.interval
+        logger.info(f"Начинаем проверку с интервалом {interval} секунд (бюджет цикла {self.cycle_budget} сек)")
 
         # Основной цикл
         while True:
+            cycle_started = time.monotonic()
             try:
-                for group_config in groups:
-                    group_id = group_config['id']
-                    group_name = group_config.get('name', group_id)
-
-                    logger.info(f"Проверяем группу: {group_name}")
-
-                    posts = self.get_last_posts(group_id, count=2)
-                    if not posts:
-                        continue
-
-                    # Проверяем, является ли первый пост закрепленным
-                    # (закрепленные посты в VK всегда идут первыми)
-                    if len(posts) > 0 and posts[0].get('is_pinned') == 1:
-                        # Если первый пост закреплен, берем второй (если есть)
-                        if len(posts) > 1:
-                            latest_post = posts[1]
-                            logger.info(f"⏭️ Пропускаем закрепленный пост (ID: {posts[0]['id']})")
-                            logger.info(f"📝 Берем следующий пост (ID: {latest_post['id']})")
-                        else:
-                            logger.info(f"⏭️ Только закрепленный пост, пропускаем проверку")
-                            continue
-                    else:
-                        latest_post = posts[0]
-
-                    post_key = f"{group_id}_{latest_post['id']}"
-
-                    if post_key not in self.last_posts:
-                        logger.info(f"Найден новый пост: {latest_post['id']}")
-
-                        # Проверяем, содержит ли пост эмодзи 🎥
-                        if self.contains_video_emoji(latest_post):
-                            logger.info(f"⏭️ Пропускаем видео-пост с эмодзи 🎥 (ID: {latest_post['id']})")
-                            self.last_posts[post_key] = datetime.now()
-                            continue
-
-                        # Проверяем, содержит ли пост эмодзи 🗓
-                        is_calendar_post = self.contains_calendar_emoji(latest_post)
-
-                        if is_calendar_post:
-                            logger.info(f"📅 Обнаружен календарный пост с эмодзи 🗓 (ID: {latest_post['id']})")
-                            logger.info(f"📤 Отправляем в календарный канал")
-                        else:
-                            logger.info(f"📝 Обнаружен обычный пост (ID: {latest_post['id']})")
-                            logger.info(f"📤 Отправляем в обычный канал")
-
-                        # Получаем информацию о группе
-                        group_info = self.get_group_info(group_id)
-
-                        # Форматируем пост
-                        discord_message = self.format_post_multiple_embeds(latest_post, group_info, is_calendar_post)
-
-                        # Отправляем в Discord
-                        if self.send_to_discord_with_retry(discord_message, is_calendar_post):
-                            self.last_posts[post_key] = datetime.now()
-                            post_type = "календарный" if is_calendar_post else "обычный"
-                            logger.info(
-                                f"✅ {post_type.capitalize()} пост {latest_post['id']} успешно опубликован в Discord")
-                        else:
-                            post_type = "календарный" if is_calendar_post else "обычный"
-                            logger.warning(
-                                f"⚠️ {post_type.capitalize()} пост {latest_post['id']} не был отправлен в Discord")
-
-                    time.sleep(2)
-
-                # Ждем перед следующей проверкой
-                logger.info(f"Ожидание {interval} секунд до следующей проверки...")
-                time.sleep(interval)
+                self.run_cycle(groups)
+
+                # Ждем перед следующей проверкой (с учетом длительности цикла)
+                wait = max(0, interval - (time.monotonic() - cycle_started))
+                logger.info(f"Ожидание {wait:.0f} секунд до следующей проверки...")
+                self.wait_next_cycle(wait)
 
             except KeyboardInterrupt:
                 logger.info("Бот остановлен пользователем")
                 break
             except Exception as e:
                 logger.error(f"Ошибка в основном цикле: {e}")
-                time.sleep(30)
+                self.wait_next_cycle(max(0, interval - (time.monotonic() - cycle_started)))
 
 
 def main():
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Диагностика групп VK2Discord Bot
+Запуск: python diagnostics.py [--config config.yaml] [--workers 8] [--timeout 15]
+
+Для всех групп из config.yaml параллельно проверяет доступ к группе,
+фильтры стены (all/owner/others) и расположение закрепленного поста,
+затем печатает таблицу с задержками. Вебхуки бота (DISCORD_WEBHOOK и
+DISCORD_THREAD_WEBHOOK) проверяются напрямую и, при неудаче, через прокси.
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import yaml
+import vk_api
+from dotenv import load_dotenv
+
+from http_session import TimeoutSession, get_proxies
+
+FILTERS = ['all', 'owner', 'others']
+
+# Порог, после которого группа считается медленной (сек на HTTP-запрос)
+SLOW_THRESHOLD = 3.0
+
+# VK ограничивает токен тремя запросами в секунду
+VK_RPS = 3
+
+
+class RateLimiter:
+    """Общий лимит частоты запросов: выдает слоты, не удерживая блокировку во время запроса"""
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> float:
+        """Ожидание своего слота, возвращает время ожидания в секундах"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class ProbeSession(TimeoutSession):
+    """Сессия VK одной группы: соблюдает общий лимит и замеряет только HTTP-запрос"""
+
+    def __init__(self, timeout: float, limiter: RateLimiter):
+        super().__init__(timeout)
+        self.limiter = limiter
+        self.last_http = None
+        self.last_queue = 0.0
+
+    def request(self, *args, **kwargs):
+        self.last_queue = self.limiter.wait()
+        started = time.perf_counter()
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            self.last_http = time.perf_counter() - started
+
+
+def make_vk(token: str, timeout: float, limiter: RateLimiter):
+    """Отдельный VkApi на группу: VkApi.method держит свою блокировку на весь запрос"""
+    session = ProbeSession(timeout, limiter)
+    vk_session = vk_api.VkApi(token=token, session=session)
+    # Лимит соблюдает общий RateLimiter, встроенная задержка VkApi не нужна
+    vk_session.RPS_DELAY = 0
+    return vk_session.get_api(), session
+
+
+def timed(func, *args, **kwargs):
+    """Вызов с замером задержки: (результат, ошибка, секунды)"""
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+
+
+def timed_vk(session: ProbeSession, func, **params):
+    """Вызов VK: (результат, ошибка, HTTP-задержка, ожидание в очереди)"""
+    session.last_http = None
+    session.last_queue = 0.0
+    result, error, wall = timed(func, **params)
+    # Если до HTTP дело не дошло, показываем общее время вызова
+    latency = session.last_http if session.last_http is not None else wall
+    return result, error, latency, session.last_queue
+
+
+def probe_group_safe(token: str, timeout: float, limiter: RateLimiter, group_config) -> Dict:
+    """Проверка группы, не роняющая весь запуск: ошибка попадает в строку группы"""
+    try:
+        return probe_group(token, timeout, limiter, group_config)
+    except Exception as e:
+        group_id = str(group_config.get('id', '?')) if isinstance(group_config, dict) else '?'
+        return {
+            'id': group_id,
+            'name': group_config.get('name', group_id) if isinstance(group_config, dict) else str(group_config),
+            'latency': {},
+            'queue': 0.0,
+            'counts': {},
+            'errors': [f"config: {type(e).__name__}: {e}"],
+            'pinned': '-',
+            'broken': True,
+        }
+
+
+def probe_group(token: str, timeout: float, limiter: RateLimiter, group_config: Dict) -> Dict:
+    """Проверка одной группы: доступ, фильтры и закрепленный пост"""
+    vk, session = make_vk(token, timeout, limiter)
+    group_id = str(group_config['id'])
+    result = {
+        'id': group_id,
+        'name': group_config.get('name', group_id),
+        'latency': {},
+        'queue': 0.0,
+        'counts': {},
+        'errors': [],
+        'pinned': '-',
+    }
+
+    # 1. Доступ к группе
+    params = {'group_id': group_id if not group_id.isdigit() else int(group_id), 'fields': 'is_closed,type,name'}
+    info, error, latency, queue = timed_vk(session, vk.groups.getById, **params)
+    result['latency']['access'] = latency
+    result['queue'] += queue
+    if error or not info:
+        result['errors'].append(f"access: {error or 'группа не найдена'}")
+        return result
+
+    group = info[0]
+    result['name'] = group_config.get('name') or group.get('name', group_id)
+    result['is_closed'] = bool(group.get('is_closed'))
+    owner_id = f"-{group['id']}"
+
+    # 2. Фильтры стены
+    for filter_type in FILTERS:
+        posts, error, latency, queue = timed_vk(session, vk.wall.get, owner_id=owner_id, count=5,
+                                                filter=filter_type)
+        result['latency'][filter_type] = latency
+        result['queue'] += queue
+        if error:
+            result['errors'].append(f"{filter_type}: {error}")
+            continue
+        items = posts['items']
+        result['counts'][filter_type] = len(items)
+
+        # 3. Закрепленный пост (в VK всегда первый)
+        if filter_type == 'all':
+            if not items:
+                result['pinned'] = 'пусто'
+            elif items[0].get('is_pinned') == 1:
+                result['pinned'] = 'закреп + пост' if len(items) > 1 else 'только закреп'
+            else:
+                result['pinned'] = 'нет закрепа'
+
+    return result
+
+
+def probe_webhook(url: str, timeout: float, proxies: Optional[Dict] = None) -> Dict:
+    """Проверка вебхука через GET (сообщение не отправляется)"""
+    session = TimeoutSession(timeout)
+    response, error, latency = timed(session.get, url, proxies=proxies)
+    if error:
+        # Текст исключения содержит URL вебхука с токеном - выводим только тип ошибки
+        return {'ok': False, 'latency': latency, 'detail': type(error).__name__}
+    return {'ok': response.status_code == 200, 'latency': latency, 'detail': str(response.status_code)}
+
+
+def probe_bot_webhook(url: str, timeout: float) -> Dict:
+    """Проверка вебхука так же, как его использует бот: напрямую, при неудаче через прокси"""
+    direct = probe_webhook(url, timeout)
+    proxy = None if direct['ok'] else probe_webhook(url, timeout, proxies=get_proxies())
+    return {'direct': direct, 'proxy': proxy, 'ok': direct['ok'] or bool(proxy and proxy['ok'])}
+
+
+def format_webhook(result: Dict) -> str:
+    return f"{'✅' if result['ok'] else '❌'} {result['detail']} ({format_ms(result['latency'])} мс)"
+
+
+def classify(result: Dict) -> str:
+    """Итоговый статус группы"""
+    if result.get('broken'):
+        return 'ОШИБКА'
+    if 'is_closed' not in result:
+        return 'НЕТ ДОСТУПА'
+    if 'all' not in result['counts']:
+        return 'СТЕНА ЗАКРЫТА' if result.get('is_closed') else 'ОШИБКА'
+    if result['pinned'] == 'пусто':
+        return 'ПУСТО'
+    if result['pinned'] == 'только закреп':
+        return 'ТОЛЬКО ЗАКРЕП'
+    if result['errors']:
+        return 'ЧАСТИЧНО'
+    if max(result['latency'].values()) > SLOW_THRESHOLD:
+        return 'МЕДЛЕННО'
+    return 'OK'
+
+
+def format_ms(seconds: Optional[float]) -> str:
+    return f"{seconds * 1000:.0f}" if seconds is not None else '-'
+
+
+def print_table(rows: List[Dict]):
+    """Печать таблицы результатов"""
+    header = ['Группа', 'Статус', 'access', *FILTERS, 'очередь', 'Посты all/owner/others', 'Закреп']
+    lines = []
+    for row in rows:
+        lines.append([
+            f"{row['name'][:30]} ({row['id']})",
+            row['status'],
+            format_ms(row['latency'].get('access')),
+            *[format_ms(row['latency'].get(f)) for f in FILTERS],
+            format_ms(row['queue']),
+            '/'.join(str(row['counts'].get(f, '-')) for f in FILTERS),
+            row['pinned'],
+        ])
+
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *lines)]
+    print(' | '.join(h.ljust(w) for h, w in zip(header, widths)))
+    print('-+-'.join('-' * w for w in widths))
+    for line in lines:
+        print(' | '.join(str(cell).ljust(w) for cell, w in zip(line, widths)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Диагностика групп VK2Discord Bot")
+    parser.add_argument('--config', default='config.yaml', help="путь к config.yaml")
+    parser.add_argument('--workers', type=int, default=8, help="число параллельных проверок")
+    parser.add_argument('--timeout', type=float, default=15, help="таймаут одного запроса, сек")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    token = os.getenv('VK_TOKEN')
+    if not token:
+        print("❌ VK_TOKEN не найден в .env")
+        return 1
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    groups = config.get('groups') or []
+    if not groups:
+        print("❌ Нет групп для отслеживания в config.yaml")
+        return 1
+
+    limiter = RateLimiter(VK_RPS)
+
+    # Бот отправляет посты только в эти два вебхука
+    webhook_names = {
+        'DISCORD_WEBHOOK': "обычные посты",
+        'DISCORD_THREAD_WEBHOOK': "календарные посты",
+    }
+    webhook_urls = {var: os.getenv(var) for var in webhook_names}
+
+    print("=" * 60)
+    print(f"🔍 ДИАГНОСТИКА {len(groups)} ГРУПП ({args.workers} потоков)")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        webhook_futures = {var: executor.submit(probe_bot_webhook, url, args.timeout)
+                           for var, url in webhook_urls.items() if url}
+        group_futures = [executor.submit(probe_group_safe, token, args.timeout, limiter, g) for g in groups]
+        webhooks = {var: future.result() for var, future in webhook_futures.items()}
+        rows = [future.result() for future in group_futures]
+
+    for row in rows:
+        row['status'] = classify(row)
+
+    print(f"ℹ️  Задержки в мс - только HTTP-запрос. VK разрешает {VK_RPS} запроса/сек на токен,")
+    print("   ожидание своей очереди вынесено в колонку 'очередь'.\n")
+    print_table(rows)
+
+    print("\n🔗 Вебхуки Discord:")
+    for var, name in webhook_names.items():
+        if var not in webhooks:
+            print(f"   ❌ {var} ({name}): не задан")
+            continue
+        webhook = webhooks[var]
+        label = f"{var} ({name}): "
+        print(f"   {label}напрямую {format_webhook(webhook['direct'])}")
+        if webhook['proxy'] is not None:
+            indent = ' ' * len(label)
+            print(f"   {indent}через прокси {format_webhook(webhook['proxy'])}")
+            if webhook['proxy']['ok']:
+                print(f"   {indent}ℹ️  доступен только через прокси - бот переключится на него сам")
+
+    errors = [(row, error) for row in rows for error in row['errors']]
+    if errors:
+        print("\n⚠️  Ошибки:")
+        for row, error in errors:
+            print(f"   • {row['name']} ({row['id']}): {error}")
+
+    print(f"\n⏱️ Общее время: {time.perf_counter() - started:.1f} сек")
+    print("\n" + "=" * 60)
+    print("РЕКОМЕНДАЦИИ:")
+    print("1. НЕТ ДОСТУПА / СТЕНА ЗАКРЫТА - вступите в группу или проверьте токен")
+    print("2. ТОЛЬКО ЗАКРЕП - бот не увидит новых постов, пока не появится второй пост")
+    print("3. Вебхук ❌ и напрямую, и через прокси - пересоздайте вебхук в Discord")
+    print("4. МЕДЛЕННО - увеличьте bot.fetch_timeout в config.yaml")
+    print("=" * 60)
+
+    groups_ok = all(row['status'] in ('OK', 'МЕДЛЕННО') for row in rows)
+    webhooks_ok = len(webhooks) == len(webhook_names) and all(w['ok'] for w in webhooks.values())
+    return 0 if groups_ok and webhooks_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+Общие HTTP-настройки бота и диагностики
+"""
+
+from typing import Dict
+
+import requests
+
+# Прокси для обхода блокировок Discord (бот переключается на них, если напрямую не работает)
+FREE_PROXIES = [
+    'http://45.61.187.67:4001',
+    'http://45.61.188.24:4002',
+    'http://45.61.188.15:4003',
+]
+
+
+def get_proxies() -> Dict:
+    """Прокси в формате requests"""
+    return {
+        'http': FREE_PROXIES[0],
+        'https': FREE_PROXIES[0]
+    }
+
+
+class TimeoutSession(requests.Session):
+    """HTTP-сессия с таймаутом по умолчанию (vk_api не задает таймаут сам)"""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
@@ -0,0 +1,328 @@
+"""
+Профилирование работающего бота без перезапуска
+
+- SamplingProfiler - сэмплирующий профайлер: фоновый поток периодически
+  снимает стеки всех потоков и копит их в формате collapsed stacks
+  (для flamegraph.pl / speedscope).
+- CycleTracer - кольцевой буфер последних N циклов со спанами вызовов,
+  экспортируется в Chrome Trace Event Format (chrome://tracing, Perfetto).
+- ProfilingControl - управление через сигналы (SIGUSR1 - профайлер,
+  SIGUSR2 - дамп трассы) и локальный Unix-сокет.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import stat
+import logging
+import threading
+import functools
+import socketserver
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Кадры, в которых поток простаивает: ожидание задачи в пуле, Event/Condition,
+# select сокета. Стек простаивающего потока в профиль не попадает.
+IDLE_FRAMES = {
+    ('thread.py', '_worker'),  # concurrent.futures: воркер ждет задачу
+    ('threading.py', 'wait'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+}
+
+# Потоки самого профилирования не сэмплируются
+OWN_THREAD_PREFIX = "profiling-"
+
+
+class SamplingProfiler:
+    """Сэмплирующий профайлер на основе sys._current_frames()
+
+    mode='wall' - стеки всех потоков, кроме простаивающих (видно и ожидание сети);
+    mode='cpu' - только потоки, потратившие процессорное время с прошлого сэмпла.
+    idle_frames - дополнительные (файл, функция) листовых кадров простоя.
+    """
+
+    def __init__(self, interval: float = 0.01, mode: str = 'wall', idle_frames=()):
+        self.interval = interval
+        self.mode = mode
+        if mode == 'cpu' and not hasattr(time, 'pthread_getcpuclockid'):
+            logger.warning("🔬 Режим cpu недоступен на этой платформе, используем wall")
+            self.mode = 'wall'
+        self.idle_frames = IDLE_FRAMES | set(idle_frames)
+        self.samples = Counter()
+        self.sample_count = 0
+        self._cpu_times = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        with self._lock:
+            self.samples.clear()
+            self.sample_count = 0
+        self._cpu_times = {}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"{OWN_THREAD_PREFIX}sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"🔬 Профайлер запущен (интервал {self.interval * 1000:.0f} мс, режим {self.mode})")
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        logger.info(f"🔬 Профайлер остановлен, снято {self.sample_count} сэмплов")
+
+    def _is_idle(self, frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in self.idle_frames
+
+    def _used_cpu(self, thread_id: int) -> bool:
+        """Потратил ли поток процессорное время с прошлого сэмпла"""
+        try:
+            cpu_time = time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+        except (OSError, OverflowError):
+            return True
+        previous = self._cpu_times.get(thread_id)
+        self._cpu_times[thread_id] = cpu_time
+        return previous is None or cpu_time > previous
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id, str(thread_id))
+                if name.startswith(OWN_THREAD_PREFIX) or self._is_idle(frame):
+                    continue
+                if self.mode == 'cpu' and not self._used_cpu(thread_id):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stack.append(name)
+                stacks.append(";".join(reversed(stack)))
+            with self._lock:
+                self.samples.update(stacks)
+                self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """Стеки в формате collapsed: 'поток;файл:функция:строка;... количество'"""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def dump(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        logger.info(f"🔬 Стеки профайлера сохранены: {path}")
+        return path
+
+
+class CycleTracer:
+    """Трассировка последних N циклов бота"""
+
+    def __init__(self, max_cycles: int = 20):
+        self.cycles = deque(maxlen=max_cycles)
+        self._current = None
+        # RLock: дамп по сигналу может прервать основной поток, удерживающий блокировку
+        self._lock = threading.RLock()
+        self._origin = time.perf_counter()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def begin_cycle(self):
+        cycle = {'start': self._now_us(), 'duration': None, 'spans': [], 'args': {}}
+        with self._lock:
+            self.cycles.append(cycle)
+            self._current = cycle
+
+    def end_cycle(self, **args):
+        with self._lock:
+            cycle, self._current = self._current, None
+        if cycle is not None:
+            cycle['duration'] = self._now_us() - cycle['start']
+            cycle['args'] = args
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Замер вызова; спан относится к циклу, в котором начался"""
+        cycle = self._current
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            if cycle is not None:
+                span = {'name': name, 'start': start, 'duration': self._now_us() - start,
+                        'tid': threading.get_ident(), 'thread': threading.current_thread().name, 'args': args}
+                with self._lock:
+                    cycle['spans'].append(span)
+
+    def export(self) -> Dict:
+        """Трасса в Chrome Trace Event Format"""
+        pid = os.getpid()
+        main_tid = threading.main_thread().ident
+        events = []
+        threads = {main_tid: threading.main_thread().name}
+
+        with self._lock:
+            cycles = [dict(cycle, spans=list(cycle['spans'])) for cycle in self.cycles]
+
+        for number, cycle in enumerate(cycles):
+            if cycle['duration'] is not None:
+                events.append({'name': 'cycle', 'cat': 'cycle', 'ph': 'X', 'pid': pid, 'tid': main_tid,
+                               'ts': cycle['start'], 'dur': cycle['duration'],
+                               'args': dict(cycle['args'], index=number)})
+            for span in cycle['spans']:
+                threads[span['tid']] = span['thread']
+                events.append({'name': span['name'], 'cat': 'call', 'ph': 'X', 'pid': pid, 'tid': span['tid'],
+                               'ts': span['start'], 'dur': span['duration'], 'args': span['args']})
+
+        for tid, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.export(), f, ensure_ascii=False)
+        logger.info(f"🧭 Трасса последних {len(self.cycles)} циклов сохранена: {path}")
+        return path
+
+
+def traced(**arg_names):
+    """Декоратор метода бота: спан в self.tracer
+
+    arg_names - имена аргументов спана и позиции аргументов метода,
+    например @traced(group=0) запишет первый аргумент как 'group'.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, 'tracer', None)
+            if tracer is None:
+                return func(self, *args, **kwargs)
+            span_args = {name: str(args[index]) for name, index in arg_names.items() if index < len(args)}
+            with tracer.span(func.__name__, **span_args):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        threading.current_thread().name = f"{OWN_THREAD_PREFIX}handler"
+        command = self.rfile.readline().decode('utf-8').strip()
+        reply = self.server.control.execute(command)
+        self.wfile.write((reply + "\n").encode('utf-8'))
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _ControlServer = None  # Unix-сокеты недоступны (Windows)
+
+
+class ProfilingControl:
+    """Управление профайлером и трассой через сигналы и Unix-сокет
+
+    Команды сокета: status, profile start, profile stop, profile dump, trace dump.
+    Пример: echo "profile start" | nc -U data/bot.sock
+    """
+
+    def __init__(self, profiler: SamplingProfiler, tracer: CycleTracer, dump_dir: str,
+                 socket_path: Optional[str] = None):
+        self.profiler = profiler
+        self.tracer = tracer
+        self.dump_dir = dump_dir
+        self.socket_path = socket_path
+        self._server = None
+        self._signals_installed = False
+
+    def _path(self, prefix: str, extension: str) -> str:
+        os.makedirs(self.dump_dir, exist_ok=True)
+        return os.path.join(self.dump_dir, f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}.{extension}")
+
+    def toggle_profiler(self) -> str:
+        if self.profiler.running:
+            self.profiler.stop()
+            return self.profiler.dump(self._path('profile', 'folded'))
+        self.profiler.start()
+        return "profiler started"
+
+    def execute(self, command: str) -> str:
+        """Выполнение команды управления, возвращает ответ"""
+        try:
+            if command == 'status':
+                return (f"profiler={'on' if self.profiler.running else 'off'} "
+                        f"samples={self.profiler.sample_count} cycles={len(self.tracer.cycles)}")
+            if command == 'profile start':
+                self.profiler.start()
+                return "profiler started"
+            if command == 'profile stop':
+                return self.toggle_profiler() if self.profiler.running else "profiler not running"
+            if command == 'profile dump':
+                return self.profiler.dump(self._path('profile', 'folded'))
+            if command == 'trace dump':
+                return self.tracer.dump(self._path('trace', 'json'))
+            return f"unknown command: {command}"
+        except Exception as e:
+            logger.error(f"Ошибка команды профилирования '{command}': {e}")
+            return f"error: {e}"
+
+    def install(self):
+        """Установка обработчиков сигналов и запуск сокета управления"""
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle_profiler())
+            signal.signal(signal.SIGUSR2, lambda signum, frame: self.execute('trace dump'))
+            self._signals_installed = True
+            logger.info("🔬 Профилирование: SIGUSR1 - профайлер вкл/выкл, SIGUSR2 - дамп трассы")
+
+        if self.socket_path and _ControlServer is not None:
+            if os.path.lexists(self.socket_path):
+                # Удаляем только старый сокет: опечатка в пути не должна стереть обычный файл
+                if not stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+                    raise FileExistsError(f"{self.socket_path} существует и не является сокетом")
+                os.unlink(self.socket_path)
+            directory = os.path.dirname(self.socket_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._server = _ControlServer(self.socket_path, _ControlHandler)
+            self._server.control = self
+            os.chmod(self.socket_path, 0o600)
+            threading.Thread(target=self._server.serve_forever, name=f"{OWN_THREAD_PREFIX}control",
+                             daemon=True).start()
+            logger.info(f"🔬 Сокет управления профилированием: {self.socket_path}")
+
+    def shutdown(self):
+        """Остановка сокета управления и снятие обработчиков сигналов"""
+        if self._signals_installed and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+            signal.signal(signal.SIGUSR2, signal.SIG_DFL)
+            self._signals_installed = False
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            # Сокет мог быть заменен, пока сервер работал - удаляем только сокет
+            if os.path.lexists(self.socket_path) and stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+                os.unlink(self.socket_path)
+            logger.info(f"🔬 Сокет управления профилированием закрыт: {self.socket_path}")
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+import requests
+import yaml
+
+import bot
+
+
+class FakeVkSession(requests.Session):
+    """HTTP-сессия VK: группа 111 зависает, остальные отвечают сразу"""
+
+    hang = threading.Event()
+    delay = 0  # Задержка ответа остальных групп, сек
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, data=None, **kwargs):
+        data = data or {}
+        group = str(data.get('group_id') or data.get('owner_id', '')).lstrip('-')
+        if group == '111':
+            # Как настоящий зависший запрос: заканчивается только по таймауту сессии
+            self.hang.wait(self.timeout)
+            raise requests.exceptions.ReadTimeout("read timed out")
+
+        time.sleep(self.delay)
+        response = requests.Response()
+        response.status_code = 200
+        if url.endswith('groups.getById'):
+            response._content = b'{"response": [{"id": %s, "name": "G"}]}' % group.encode()
+        else:
+            response._content = b'{"response": {"count": 0, "items": []}}'
+        return response
+
+
+@pytest.fixture
+def make_bot(tmp_path, monkeypatch):
+    instances = []
+
+    def factory(group_ids, **bot_config):
+        bot_config = {'interval': 30, 'fetch_timeout': 0.6, 'group_pause': 0, **bot_config}
+        config = {'groups': [{'id': group_id} for group_id in group_ids], 'bot': bot_config}
+        (tmp_path / 'config.yaml').write_text(yaml.safe_dump(config), encoding='utf-8')
+
+        instance = bot.VK2DiscordBot(use_proxy=False)
+        instance.sleep_until = lambda deadline, seconds: None
+        instances.append(instance)
+        return instance
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('VK_TOKEN', 'token')
+    monkeypatch.setenv('DISCORD_WEBHOOK', 'https://discord.invalid/normal')
+    monkeypatch.setenv('DISCORD_THREAD_WEBHOOK', 'https://discord.invalid/calendar')
+    monkeypatch.setattr(bot, 'TimeoutSession', FakeVkSession)
+    yield factory
+
+    FakeVkSession.hang.set()
+    for instance in instances:
+        instance.executor.shutdown(wait=True)
+    FakeVkSession.hang.clear()
+    FakeVkSession.delay = 0
+
+
+@pytest.fixture
+def vk_bot(make_bot):
+    return make_bot(['111', '222'])
+
+
+def test_hung_group_does_not_block_healthy_group(vk_bot):
+    groups = vk_bot.config['groups']
+
+    report = vk_bot.run_cycle(groups)
+
+    assert [slow['group'] for slow in report['slow']] == ['111']
+    assert '111' in vk_bot.lagging_groups
+    assert '222' not in vk_bot.lagging_groups
+
+
+def test_over_budget_groups_are_skipped_not_lagging_and_do_not_starve(make_bot):
+    FakeVkSession.delay = 0.3
+    group_ids = [str(101 + i) for i in range(6)]
+    vk_bot = make_bot(group_ids, interval=3, fetch_timeout=3, group_pause=0.1)
+    groups = vk_bot.config['groups']
+
+    reports = [vk_bot.run_cycle(groups) for _ in range(3)]
+
+    # Шесть групп не помещаются в бюджет: хвост пропущен, но не отправлен в отстающие
+    assert reports[0]['skipped']
+    assert all(report['slow'] == [] for report in reports)
+    assert vk_bot.lagging_groups == {}
+    # Пропущенные группы идут первыми в следующем цикле, поэтому за несколько циклов
+    # обработаны все, а не только начало списка
+    assert reports[1]['skipped'][:1] != reports[0]['skipped'][:1]
+    processed = {group_id for report in reports for group_id in group_ids if group_id not in report['skipped']}
+    assert processed == set(group_ids)
+
+
+def test_failed_fetch_does_not_recover_lagging_group(vk_bot, monkeypatch):
+    def failing_fetch(group_id, count=10, raise_errors=False):
+        raise RuntimeError("VK недоступен")
+
+    vk_bot.mark_lagging('222', "медленно")
+    vk_bot.lagging_groups['222']['retry_at'] = time.monotonic()
+    monkeypatch.setattr(vk_bot, 'get_last_posts', failing_fetch)
+
+    report = vk_bot.run_cycle([{'id': '222'}])
+
+    assert report['failed'] == ['222']
+    assert report['recovered'] == []
+    assert vk_bot.lagging_groups['222']['failures'] == 2
+
+
+def test_empty_fetch_recovers_lagging_group(vk_bot):
+    vk_bot.mark_lagging('222', "медленно")
+    vk_bot.lagging_groups['222']['retry_at'] = time.monotonic()
+
+    report = vk_bot.run_cycle([{'id': '222'}])
+
+    assert report['recovered'] == ['222']
+    assert '222' not in vk_bot.lagging_groups
+
+
+def test_cycle_records_bot_spans(vk_bot):
+    vk_bot.run_cycle([{'id': '222'}])
+
+    spans = {event['name'] for event in vk_bot.tracer.export()['traceEvents'] if event['ph'] == 'X'}
+    assert {'get_group_info', 'get_last_posts'} <= spans
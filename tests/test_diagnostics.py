@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import diagnostics
+
+VK_DELAY = 0.1
+
+
+def fake_vk_request(self, method, url, data=None, **kwargs):
+    time.sleep(VK_DELAY)
+    group = str((data or {}).get('group_id') or (data or {}).get('owner_id', '')).lstrip('-')
+    response = requests.Response()
+    response.status_code = 200
+    if url.endswith('groups.getById'):
+        response._content = b'{"response": [{"id": %s, "name": "G", "is_closed": 0}]}' % group.encode()
+    else:
+        response._content = b'{"response": {"count": 2, "items": [{"id": 2, "is_pinned": 1}, {"id": 1}]}}'
+    return response
+
+
+def test_concurrent_probes_report_http_latency_not_queueing(monkeypatch):
+    monkeypatch.setattr(requests.Session, 'request', fake_vk_request)
+    # Быстрый лимит, чтобы тест шел пару секунд; 12 групп x 4 запроса все равно встают в очередь
+    limiter = diagnostics.RateLimiter(20)
+    groups = [{'id': str(100 + i)} for i in range(12)]
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        rows = list(executor.map(lambda group: diagnostics.probe_group('token', 5, limiter, group), groups))
+
+    for row in rows:
+        assert not row['errors']
+        assert max(row['latency'].values()) < VK_DELAY + 0.2
+        assert diagnostics.classify(row) == 'OK'
+    assert max(row['queue'] for row in rows) > 1
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = diagnostics.RateLimiter(10)
+    waits = [limiter.wait() for _ in range(3)]
+    assert waits[0] == 0
+    assert 0.05 < waits[1] <= 0.1
+    assert 0.05 < waits[2] <= 0.1
+
+
+def test_group_without_id_is_reported_in_its_row(monkeypatch):
+    monkeypatch.setattr(requests.Session, 'request', fake_vk_request)
+    limiter = diagnostics.RateLimiter(20)
+
+    row = diagnostics.probe_group_safe('token', 5, limiter, {'name': 'Без id'})
+
+    assert row['name'] == 'Без id'
+    assert row['errors'] and row['errors'][0].startswith('config: KeyError')
+    assert diagnostics.classify(row) == 'ОШИБКА'
+
+
+def test_webhook_reachable_only_through_proxy(monkeypatch):
+    def fake_get(self, url, proxies=None, **kwargs):
+        if not proxies:
+            raise requests.exceptions.ConnectionError("blocked")
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    monkeypatch.setattr(requests.Session, 'get', fake_get)
+
+    result = diagnostics.probe_bot_webhook('https://discord.invalid/webhook', 5)
+
+    assert result['ok']
+    assert result['direct'] == {'ok': False, 'latency': result['direct']['latency'], 'detail': 'ConnectionError'}
+    assert result['proxy']['ok']
+
+
+def test_diagnostics_does_not_import_bot():
+    # В отдельном процессе: в этом bot уже мог импортировать другой тест
+    code = "import sys, diagnostics; print('bot' in sys.modules, 'profiling' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert output.stdout.split() == ['False', 'False']
@@ -0,0 +1,113 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from profiling import CycleTracer, ProfilingControl, SamplingProfiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def sleeping_loop(stop):
+    # Как основной поток бота в time.sleep: в wall виден, CPU не тратит
+    stop.wait(0.01)
+    time.sleep(0.5)
+
+
+def profile(mode):
+    stop = threading.Event()
+    idle_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=2)
+    executor.submit(lambda: None).result()  # воркер создан и ждет задач
+    threads = [
+        threading.Thread(target=busy_loop, args=(stop,), name="busy", daemon=True),
+        threading.Thread(target=sleeping_loop, args=(stop,), name="sleeper", daemon=True),
+        threading.Thread(target=idle_event.wait, name="waiter", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    profiler = SamplingProfiler(interval=0.005, mode=mode)
+    profiler.start()
+    time.sleep(0.3)
+    profiler.stop()
+
+    stop.set()
+    idle_event.set()
+    executor.shutdown()
+    return profiler.collapsed()
+
+
+def test_wall_mode_skips_idle_threads():
+    collapsed = profile('wall')
+
+    assert "busy;" in collapsed
+    assert "sleeper;" in collapsed
+    assert "waiter;" not in collapsed
+    assert "ThreadPoolExecutor" not in collapsed
+    assert "profiling-" not in collapsed
+
+
+@pytest.mark.skipif(not hasattr(time, 'pthread_getcpuclockid'), reason="нет CPU-часов потоков")
+def test_cpu_mode_samples_only_busy_threads():
+    lines = profile('cpu').splitlines()
+    busy = sum(int(line.rsplit(' ', 1)[1]) for line in lines if line.startswith("busy;"))
+    sleeper = sum(int(line.rsplit(' ', 1)[1]) for line in lines if line.startswith("sleeper;"))
+
+    assert busy > 10
+    # Спящий поток попадает в профиль только в первом сэмпле и при пробуждении
+    assert sleeper < busy / 4
+
+
+def test_control_socket_refuses_to_remove_regular_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("groups: []\n", encoding='utf-8')
+    control = ProfilingControl(SamplingProfiler(), CycleTracer(), str(tmp_path), socket_path=str(path))
+
+    with pytest.raises(FileExistsError):
+        control.install()
+    assert path.read_text(encoding='utf-8') == "groups: []\n"
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="нет Unix-сокетов")
+def test_control_socket_replaces_stale_socket(tmp_path):
+    path = str(tmp_path / "bot.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    control = ProfilingControl(SamplingProfiler(), CycleTracer(), str(tmp_path), socket_path=path)
+    control.install()
+    try:
+        client = socket.socket(socket.AF_UNIX)
+        client.connect(path)
+        client.sendall(b"status\n")
+        assert client.recv(1024).startswith(b"profiler=off")
+        client.close()
+    finally:
+        control.shutdown()
+
+    assert not os.path.lexists(path)
+    assert not any(t.name == "profiling-control" for t in threading.enumerate())
+
+
+def test_tracer_keeps_last_cycles_and_exports_trace_events():
+    tracer = CycleTracer(max_cycles=2)
+    for _ in range(3):
+        tracer.begin_cycle()
+        with tracer.span('get_last_posts', group='1'):
+            pass
+        tracer.end_cycle(slow=0)
+
+    events = tracer.export()['traceEvents']
+    spans = [event for event in events if event['ph'] == 'X']
+
+    assert len(tracer.cycles) == 2
+    assert [event['name'] for event in spans] == ['cycle', 'get_last_posts'] * 2
+    assert all(event['pid'] == os.getpid() and event['dur'] >= 0 for event in spans)
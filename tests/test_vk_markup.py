@@ -0,0 +1,95 @@
+import pytest
+
+from vk_markup import ELLIPSIS, vk_to_discord
+
+FAMILY = "👨‍👩‍👧‍👦"  # ZWJ-последовательность из 7 кодовых точек
+FLAG = "🇷🇺"  # пара региональных индикаторов
+KEYCAP = "1️⃣"  # цифра + VS16 + U+20E3
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("[id123|Павел]", "[Павел](https://vk.com/id123)"),
+    ("[club1|Группа_1]", "[Группа\\_1](https://vk.com/club1)"),
+    ("[public5|П] [event7|Гонка]", "[П](https://vk.com/public5) [Гонка](https://vk.com/event7)"),
+    ("[https://example.com/a|сайт]", "[сайт](https://example.com/a)"),
+])
+def test_wiki_links(text, expected):
+    assert vk_to_discord(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Ответ: [Да|Нет]", "Ответ: \\[Да\\|Нет\\]"),
+    ("Итоги [Гонка 1 | Монца]", "Итоги \\[Гонка 1 \\| Монца\\]"),
+    ("Vote [Yes|No] now", "Vote \\[Yes\\|No\\] now"),
+    ("[durov|Дуров]", "\\[durov\\|Дуров\\]"),
+    ("[id12a|x]", "\\[id12a\\|x\\]"),
+])
+def test_plain_brackets_are_escaped_not_linked(text, expected):
+    assert vk_to_discord(text) == expected
+
+
+def test_community_hashtag():
+    assert vk_to_discord("#новости@irs_f1") == "[#новости](https://vk.com/irs_f1/новости)"
+
+
+def test_plain_hashtag_is_kept():
+    assert vk_to_discord("#f1 #гонка") == "#f1 #гонка"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("см. https://vk.com/wall-1_2.", "см. https://vk.com/wall-1_2."),
+    ("(https://vk.com/durov), далее", "(https://vk.com/durov), далее"),
+    ("https://ru.wikipedia.org/wiki/A_(b)!", "https://ru.wikipedia.org/wiki/A_(b)!"),
+    ("vk.com/durov?", "https://vk.com/durov?"),
+])
+def test_url_trailing_punctuation(text, expected):
+    assert vk_to_discord(text) == expected
+
+
+def test_url_underscores_are_not_escaped():
+    assert vk_to_discord("https://vk.com/a_b_c") == "https://vk.com/a_b_c"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("*жирный* _курсив_ ~~зачеркнутый~~ `код` ||спойлер||",
+     "\\*жирный\\* \\_курсив\\_ \\~\\~зачеркнутый\\~\\~ \\`код\\` \\|\\|спойлер\\|\\|"),
+    ("> цитата", "\\> цитата"),
+    ("# заголовок\n## подзаголовок", "\\# заголовок\n\\## подзаголовок"),
+    ("-# подпись", "\\-# подпись"),
+    ("- пункт\n  - вложенный", "\\- пункт\n  \\- вложенный"),
+    ("1. первый\n2. второй", "1\\. первый\n2\\. второй"),
+    ("<@123> <#1>", "\\<@123> \\<#1>"),
+    ("a - b, 2. c", "a - b, 2. c"),
+])
+def test_discord_formatting_is_escaped(text, expected):
+    assert vk_to_discord(text) == expected
+
+
+@pytest.mark.parametrize("grapheme", [FAMILY, FLAG, KEYCAP])
+def test_truncation_keeps_graphemes_whole(grapheme):
+    text = "ab" + grapheme * 20
+    for limit in range(len(ELLIPSIS) + 2, len(text)):
+        result = vk_to_discord(text, limit)
+        assert len(result) <= limit
+        assert result.endswith(ELLIPSIS)
+        body = result[:-len(ELLIPSIS)]
+        assert body.startswith("ab")
+        assert body[2:] == grapheme * ((len(body) - 2) // len(grapheme))
+
+
+def test_truncation_does_not_split_link():
+    link = "[Очень длинное имя](https://vk.com/id123)"
+    text = "начало [id123|Очень длинное имя] конец"
+    for limit in range(len(ELLIPSIS) + 1, len(text) + 20):
+        result = vk_to_discord(text, limit)
+        assert len(result) <= limit
+        assert "](" not in result or link in result
+        assert "https://vk.com/id" not in result or link in result
+
+
+def test_truncation_prefers_word_boundary():
+    assert vk_to_discord("один два три четыре", 14) == "один два..."
+
+
+def test_short_text_is_not_truncated():
+    assert vk_to_discord("привет", 6) == "привет"
@@ -0,0 +1,169 @@
+"""
+Преобразование разметки VK в Markdown Discord
+
+Один линейный проход по тексту: вики-ссылки ([id1|Имя], [club1|Группа],
+[https://...|текст]), хэштеги сообществ (#тег@группа) и ссылки
+превращаются в ссылки Discord, остальной текст экранируется.
+Обрезка идет только по границам токенов и графем, чтобы не рвать
+ссылки и составные эмодзи.
+"""
+
+import re
+import unicodedata
+from typing import List, Tuple
+
+# Лимит description в embed, который использует бот
+DISCORD_TEXT_LIMIT = 2000
+ELLIPSIS = "..."
+
+# Если при обрезке пробел найден не дальше этого числа символов - режем по слову
+WORD_CUT_LOOKBACK = 80
+
+# Вики-ссылкой считаются только цели, которые ставит сам VK:
+# id123, club123, public123, event123 или http(s)-ссылка. Короткие имена
+# не распознаются - [Yes|No] неотличимо от обычного текста в скобках.
+# Остальные [текст|текст] экранируются как обычный текст.
+_TOKEN_RE = re.compile(
+    r"(?P<wiki>\[(?P<target>(?:id|club|public|event)\d+|https?://[^\s\[\]|]+)\|(?P<label>[^\[\]\n]+)\])"
+    r"|(?P<tag>#(?P<tag_name>\w+)@(?P<tag_group>[A-Za-z0-9_.]+))"
+    r"|(?P<url>(?:https?://|(?<![\w.])(?:m\.)?vk\.com/)[^\s<>\[\]]+)"
+    # Разметка начала строки: цитаты, заголовки, подписи (-#), списки
+    r"|(?P<line>^(?P<indent>[ \t]*)(?P<marker>>|#(?=[#\s])|-(?=[#\s])|\d+\.(?=\s)))"
+    r"|(?P<special>[\\*_~`|\[\]<])",
+    re.MULTILINE,
+)
+
+# Завершающая пунктуация, которая почти всегда не часть ссылки
+_URL_TRAILING = '.,;:!?)»"\''
+
+ZWJ = "\u200d"  # zero width joiner
+
+
+def _escape(text: str) -> str:
+    """Экранирование текста внутри ссылки"""
+    return re.sub(r"([\\*_~`|\[\]<])", r"\\\1", text)
+
+
+def _wiki_url(target: str) -> str:
+    if target.startswith(("http://", "https://")):
+        return target
+    # id123, club123, public123, event123
+    return f"https://vk.com/{target}"
+
+
+def _split_url(url: str) -> Tuple[str, str]:
+    """Отделение завершающей пунктуации от ссылки"""
+    stripped = url.rstrip(_URL_TRAILING)
+    # Закрывающая скобка остается, если в ссылке есть открывающая
+    while url[len(stripped):].startswith(")") and stripped.count("(") > stripped.count(")"):
+        stripped += ")"
+    return stripped, url[len(stripped):]
+
+
+def tokenize(text: str) -> List[Tuple[str, bool]]:
+    """Разбор текста на токены (строка Discord, можно_резать)
+
+    Неделимые токены (ссылки, экранированные символы) помечены False.
+    """
+    tokens = []
+    position = 0
+
+    for match in _TOKEN_RE.finditer(text):
+        if match.start() > position:
+            tokens.append((text[position:match.start()], True))
+        position = match.end()
+
+        kind = match.lastgroup
+        if kind == "wiki":
+            target, label = match.group("target"), match.group("label").strip()
+            tokens.append((f"[{_escape(label)}]({_wiki_url(target)})", False))
+        elif kind == "tag":
+            name, group = match.group("tag_name"), match.group("tag_group")
+            tokens.append((f"[#{_escape(name)}](https://vk.com/{group}/{name})", False))
+        elif kind == "url":
+            url, trailing = _split_url(match.group("url"))
+            if not url.startswith(("http://", "https://")):
+                url = f"https://{url}"
+            tokens.append((url, False))
+            if trailing:
+                tokens.append((_escape(trailing), True))
+        elif kind == "line":
+            marker = match.group("marker")
+            # 1. -> 1\. , остальные маркеры экранируются целиком
+            escaped = f"{marker[:-1]}\\." if marker.endswith(".") else f"\\{marker}"
+            tokens.append((match.group("indent") + escaped, False))
+        else:
+            tokens.append(("\\" + match.group(), False))
+
+    if position < len(text):
+        tokens.append((text[position:], True))
+
+    return tokens
+
+
+def _is_extender(char: str) -> bool:
+    """Символ, который продолжает предыдущую графему"""
+    code = ord(char)
+    return (
+        char == ZWJ
+        or unicodedata.combining(char) != 0
+        or unicodedata.category(char) in ("Mn", "Me", "Mc")
+        or 0xFE00 <= code <= 0xFE0F  # вариационные селекторы
+        or 0x1F3FB <= code <= 0x1F3FF  # оттенки кожи
+        or 0xE0020 <= code <= 0xE007F  # теги (флаги регионов)
+    )
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def grapheme_cut(text: str, limit: int) -> int:
+    """Наибольшая позиция <= limit, не разрывающая графему"""
+    if limit >= len(text):
+        return len(text)
+
+    cut = limit
+    while cut > 0 and (_is_extender(text[cut]) or text[cut - 1] == ZWJ):
+        cut -= 1
+
+    # Флаги - пары региональных индикаторов
+    if cut > 0 and _is_regional_indicator(text[cut]):
+        start = cut
+        while start > 0 and _is_regional_indicator(text[start - 1]):
+            start -= 1
+        if (cut - start) % 2:
+            cut -= 1
+
+    return cut
+
+
+def _cut_plain(text: str, limit: int) -> str:
+    """Обрезка обычного текста по слову или хотя бы по графеме"""
+    cut = grapheme_cut(text, limit)
+    space = text.rfind(" ", max(0, cut - WORD_CUT_LOOKBACK), cut + 1)
+    if space > 0:
+        cut = space
+    return text[:cut].rstrip()
+
+
+def vk_to_discord(text: str, limit: int = DISCORD_TEXT_LIMIT) -> str:
+    """Преобразование текста поста VK в Markdown Discord с обрезкой до limit"""
+    tokens = tokenize(text)
+
+    parts = []
+    length = 0
+    total = sum(len(token) for token, _ in tokens)
+    if total <= limit:
+        return "".join(token for token, _ in tokens)
+
+    budget = limit - len(ELLIPSIS)
+    for token, divisible in tokens:
+        if length + len(token) > budget:
+            if divisible:
+                parts.append(_cut_plain(token, budget - length))
+            break
+        parts.append(token)
+        length += len(token)
+
+    return "".join(parts).rstrip() + ELLIPSIS